@@ -1,6 +1,10 @@
 import os
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
+
+# 配置文件目录，与程序位置绑定，只在导入时计算一次
+_CONFIG_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs")
+_DEFAULT_CONFIG_FILE = os.path.join(_CONFIG_FOLDER, "default_config.json")
 
 class TranslationConfig:
     """翻译提取的配置参数"""
@@ -27,12 +31,11 @@ class TranslationConfig:
         
         # 其他设置
         self.encoding = "utf-8"      # 文件编码
-        self.max_threads = 1         # 最大线程数（暂时未使用）
+        self.max_threads = 1         # 最大并行进程数，大于1时并行提取文件
         
-        # 配置文件路径
-        self.config_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs")
-        os.makedirs(self.config_folder, exist_ok=True)
-        self.default_config_file = os.path.join(self.config_folder, "default_config.json")
+        # 配置文件路径，目录在保存配置时才创建
+        self.config_folder = _CONFIG_FOLDER
+        self.default_config_file = _DEFAULT_CONFIG_FILE
     
     def to_dict(self) -> Dict[str, Any]:
         """将配置转换为字典"""
@@ -79,13 +82,43 @@ class TranslationConfig:
     def save_default_config(self) -> bool:
         """保存默认配置"""
         try:
-            with open(self.default_config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            # 先序列化为完整字符串再一次写入，json.dump会分成大量小块写入
+            data = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+            
+            # 配置没有变化时不再写入，关闭窗口时总会保存一次配置，大多数情况下内容并未改变
+            if self._read_config_file() == data:
+                return True
+            
+            os.makedirs(self.config_folder, exist_ok=True)
+            
+            # 先写入临时文件再替换，写入中途出错时原配置文件保持完整
+            temp_file = self.default_config_file + ".tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.default_config_file)
+            except Exception:
+                # 写入或替换失败时删除残留的临时文件
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+                raise
             return True
         except Exception as e:
             print(f"保存配置失败: {str(e)}")
             return False
     
+    def _read_config_file(self) -> Optional[str]:
+        """读取默认配置文件的内容，文件不存在或无法读取时返回None"""
+        try:
+            with open(self.default_config_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+    
     def load_default_config(self) -> bool:
         """加载默认配置"""
         try:
@@ -93,7 +126,7 @@ class TranslationConfig:
                 return False
                 
             with open(self.default_config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = json.loads(f.read())
             
             self.from_dict(data)
             return True
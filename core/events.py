@@ -2,7 +2,7 @@
 事件管理模块
 提供统一的事件发布-订阅机制，用于应用程序内部组件间通信
 """
-from typing import Dict, List, Callable, Any, Optional
+from typing import Dict, Callable, Any, Optional
 from .logger import get_logger
 
 class EventManager:
@@ -24,8 +24,9 @@ class EventManager:
             return
             
         self.logger = get_logger()
-        # 事件订阅字典 {event_name: [callback1, callback2, ...]}
-        self.subscribers: Dict[str, List[Callable[..., None]]] = {}
+        # 事件订阅字典 {event_name: {callback1: None, callback2: None, ...}}
+        # 内层字典作为保持订阅顺序的集合使用
+        self.subscribers: Dict[str, Dict[Callable[..., None], None]] = {}
         self.logger.debug("事件管理器初始化完成")
         
     def subscribe(self, event_name: str, callback: Callable[..., None]) -> None:
@@ -36,11 +37,9 @@ class EventManager:
             event_name: 事件名称
             callback: 事件回调函数
         """
-        if event_name not in self.subscribers:
-            self.subscribers[event_name] = []
-        
-        if callback not in self.subscribers[event_name]:
-            self.subscribers[event_name].append(callback)
+        callbacks = self.subscribers.setdefault(event_name, {})
+        if callback not in callbacks:
+            callbacks[callback] = None
             self.logger.debug(f"已订阅事件 '{event_name}'")
     
     def unsubscribe(self, event_name: str, callback: Callable[..., None]) -> None:
@@ -51,12 +50,13 @@ class EventManager:
             event_name: 事件名称
             callback: 事件回调函数
         """
-        if event_name in self.subscribers and callback in self.subscribers[event_name]:
-            self.subscribers[event_name].remove(callback)
+        callbacks = self.subscribers.get(event_name)
+        if callbacks is not None and callback in callbacks:
+            del callbacks[callback]
             self.logger.debug(f"已取消订阅事件 '{event_name}'")
             
             # 如果没有订阅者了，清理事件
-            if not self.subscribers[event_name]:
+            if not callbacks:
                 del self.subscribers[event_name]
     
     def publish(self, event_name: str, **kwargs: Any) -> None:
@@ -67,15 +67,30 @@ class EventManager:
             event_name: 事件名称
             **kwargs: 事件参数
         """
-        if event_name not in self.subscribers:
+        # 无订阅者时直接返回，每个文件都会发布事件，这里需要尽量轻量
+        callbacks = self.subscribers.get(event_name)
+        if not callbacks:
             return
             
-        for callback in self.subscribers[event_name]:
+        # 遍历快照，回调中订阅或取消订阅不影响本次发布
+        for callback in tuple(callbacks):
             try:
                 callback(**kwargs)
             except Exception as e:
                 self.logger.error(f"执行事件 '{event_name}' 回调时出错: {str(e)}")
     
+    def has_subscribers(self, event_name: str) -> bool:
+        """
+        检查事件是否有订阅者
+        
+        Args:
+            event_name: 事件名称
+            
+        Returns:
+            是否至少有一个订阅者
+        """
+        return event_name in self.subscribers
+    
     def clear_all_subscribers(self) -> None:
         """清除所有订阅者"""
         self.subscribers.clear()
@@ -126,6 +141,17 @@ def unsubscribe(event_name: str, callback: Callable[..., None]) -> None:
     """取消订阅事件"""
     get_event_manager().unsubscribe(event_name, callback)
 
+def has_subscribers(event_name: str) -> bool:
+    """检查事件是否有订阅者，用于在热点路径上跳过构造事件参数"""
+    manager = EventManager._instance
+    if manager is None:
+        return False
+    return event_name in manager.subscribers
+
 def publish(event_name: str, **kwargs: Any) -> None:
     """发布事件"""
-    get_event_manager().publish(event_name, **kwargs)
+    # 直接使用已创建的单例，省去两层函数调用
+    manager = EventManager._instance
+    if manager is None:
+        manager = EventManager.instance()
+    manager.publish(event_name, **kwargs)
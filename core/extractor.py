@@ -1,14 +1,28 @@
 import os
 import re
-import glob
-from pathlib import Path
-from typing import Dict, List, Tuple, Callable, Set, Optional
+import fnmatch
+from typing import Dict, Iterator, List, Pattern, Tuple, Optional
 from .config import TranslationConfig
 from .factories.extractor_factory import ExtractorFactory
 from .factories.validator_factory import ValidatorFactory
 from .factories.writer_factory import WriterFactory
 from .logger import get_logger
-from .events import publish, EventNames
+from .events import publish, has_subscribers, EventNames
+
+def _compile_file_patterns(patterns: List[Tuple[int, str]]) -> Optional[Pattern]:
+    """
+    将多个通配符模式合并为一个正则表达式，每个文件名只需匹配一次
+    
+    命名分组p{序号}对应模式的序号，匹配后通过lastgroup取得；
+    交替分支按顺序尝试，结果与逐个调用fnmatch时第一个匹配的模式一致
+    """
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?P<p{index}>{fnmatch.translate(os.path.normcase(pattern))})'
+                               for index, pattern in patterns))
+
+# 已有翻译文件中的old字符串模式
+_OLD_STRING_RE = re.compile(r'old\s+(?:"([^"\\]*(?:\\.[^"\\]*)*)"|"""([\s\S]*?)""")')
 
 class TranslationExtractor:
     """翻译文本提取器"""
@@ -78,73 +92,143 @@ class TranslationExtractor:
         return entries_count
     
     def _find_files(self, game_dir: str) -> List[str]:
-        """查找所有需要处理的文件"""
-        files = []
+        """
+        查找所有需要处理的文件
         
-        if self.config.recursive:
-            # 递归搜索所有子目录
-            for pattern in self.config.file_patterns:
-                found = glob.glob(os.path.join(game_dir, "**", pattern), recursive=True)
-                files.extend(found)
-        else:
-            # 只搜索当前目录
-            for pattern in self.config.file_patterns:
-                found = glob.glob(os.path.join(game_dir, pattern))
-                files.extend(found)
+        使用os.scandir手动遍历目录，遍历到翻译目录时直接跳过，不再进入其子目录；
+        与glob一致，忽略以点开头的隐藏文件和目录，结果按文件模式分组
+        """
+        patterns = self.config.file_patterns
+        matched: List[List[str]] = [[] for _ in patterns]
         
         # 跳过翻译目录中的文件
         tl_path = os.path.join(self.config.game_dir, self.config.translation_dir)
-        if os.path.exists(tl_path):
-            files = [f for f in files if not f.startswith(tl_path)]
+        tl_abs = os.path.normcase(os.path.abspath(tl_path))
+        
+        # 与glob一致，以点开头的隐藏文件只匹配以点开头的模式
+        visible_re = _compile_file_patterns(list(enumerate(patterns)))
+        hidden_re = _compile_file_patterns([(index, pattern) for index, pattern in enumerate(patterns)
+                                            if pattern.startswith('.')])
+        
+        def scan(directory: str):
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                return
+            
+            subdirs = []
+            for entry in entries:
+                name = entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                
+                if is_dir:
+                    if self.config.recursive and not name.startswith('.'):
+                        subdirs.append(entry.path)
+                    continue
+                
+                # 每个文件只归入第一个匹配的模式，避免重复处理
+                regex = hidden_re if name.startswith('.') else visible_re
+                if regex is not None:
+                    match = regex.match(os.path.normcase(name))
+                    if match:
+                        matched[int(match.lastgroup[1:])].append(entry.path)
+            
+            # 先处理当前目录的文件，再依次深入子目录
+            for subdir in subdirs:
+                if os.path.normcase(os.path.abspath(subdir)) == tl_abs:
+                    continue
+                scan(subdir)
+        
+        scan(game_dir)
         
+        files = []
+        for found in matched:
+            files.extend(found)
         return files
     
+    def _iter_file_results(self, files: List[str]) -> Iterator[Tuple[int, List[Tuple[int, str]], Optional[Exception]]]:
+        """
+        按文件顺序逐个返回读取和提取的结果
+        
+        max_threads大于1时由提取工厂使用进程池并行读取和提取，否则在当前进程中依次处理；
+        验证和去重依赖共享状态，仍由调用方在主进程中按顺序完成
+        """
+        # 与配置说明一致，只有大于1时才并行，0和1都在当前进程中依次处理
+        workers = self.config.max_threads or 1
+        return self.extractor_factory.extract_batch(files, self.config.extractors,
+                                                    self.config.encoding, workers)
+    
     def _extract_strings(self, files: List[str]) -> Dict[str, List[Tuple[int, str]]]:
         """从所有文件中提取需要翻译的字符串"""
         file_entries = {}  # {filepath: [(line_num, original_text), ...]}
         seen_strings = set()  # 用于去重
         
+        # 热循环中频繁调用的方法提前绑定为局部变量
+        seen_add = seen_strings.add
+        logger_debug = self.logger.debug
+        
+        # 验证器在整个提取过程中不变，只解析一次，避免每个文本都按名称查找；
+        # 按开销从小到大排列，全局去重最后执行
+        validators = self.validator_factory.get_validator_chain(self.config.validators)
+        
+        # 启用内置全局去重验证器时，通过验证的文本已经互不重复，无需再维护一份去重集合
+        dedup_locally = not self.validator_factory.deduplicates_globally(self.config.validators)
+        
+        extracted_count = 0
         total_files = len(files)
-        for i, filepath in enumerate(files):
+        results = self._iter_file_results(files)
+        for i, (filepath, (content_length, entries, error)) in enumerate(zip(files, results)):
             try:
                 # 更新进度
                 self.update_progress(i, total_files)
                 
                 # 添加文件处理开始的日志
-                self.logger.debug(f"正在处理文件: {os.path.basename(filepath)}")
+                self.logger.debug("正在处理文件: %s", os.path.basename(filepath))
                 
                 try:
-                    # 使用with语句确保文件正确关闭
-                    with open(filepath, 'r', encoding=self.config.encoding, errors='replace') as f:
-                        content = f.read()
+                    # 读取或提取阶段的异常在此重新抛出，统一按文件处理
+                    if error is not None:
+                        raise error
                     
-                    # 发布文件加载事件
-                    publish(EventNames.FILE_LOADED, filepath=filepath, content_length=len(content))
-                    
-                    # 使用提取工厂提取文本
-                    entries = self.extractor_factory.extract_from_content(content, filepath, self.config.extractors)
+                    # 发布文件加载事件，无订阅者时跳过
+                    if has_subscribers(EventNames.FILE_LOADED):
+                        publish(EventNames.FILE_LOADED, filepath=filepath, content_length=content_length)
                     
                     # 验证提取的文本
                     validated_entries = []
+                    validated_append = validated_entries.append
                     for line_num, text in entries:
                         # 使用配置中指定的验证器验证文本是否有效
-                        if self.validator_factory.validate_text(text, self.config.validators):
-                            validated_entries.append((line_num, text))
+                        for name, validator in validators:
+                            if not validator(text):
+                                logger_debug("文本 '%s...' 未通过验证器 '%s'", text[:30], name)
+                                break
                         else:
-                            self.logger.debug(f"文本未通过验证: '{text[:30]}...'")
+                            validated_append((line_num, text))
                     
                     # 去重并添加到结果
                     if validated_entries:
-                        # 过滤已经见过的字符串
-                        unique_entries = []
-                        for line_num, text in validated_entries:
-                            if text not in seen_strings:
-                                seen_strings.add(text)
-                                unique_entries.append((line_num, text))
+                        if dedup_locally:
+                            # 过滤已经见过的字符串
+                            unique_entries = []
+                            unique_append = unique_entries.append
+                            for entry in validated_entries:
+                                text = entry[1]
+                                if text not in seen_strings:
+                                    seen_add(text)
+                                    unique_append(entry)
+                        else:
+                            unique_entries = validated_entries
                         
                         if unique_entries:
                             file_entries[filepath] = unique_entries
-                            self.log(f"从文件 {os.path.basename(filepath)} 提取了 {len(unique_entries)} 个有效文本条目")
+                            extracted_count += len(unique_entries)
+                            # 单个文件的结果只写入调试日志，避免每个文件都推送到控制台和界面
+                            logger_debug("从文件 %s 提取了 %d 个有效文本条目", os.path.basename(filepath), len(unique_entries))
                 
                 except UnicodeDecodeError as e:
                     self.logger.error(f"文件编码错误 {filepath}: {str(e)}, 尝试跳过该文件")
@@ -158,11 +242,6 @@ class TranslationExtractor:
                     publish(EventNames.EXTRACTION_ERROR, error=str(e), message=f"处理文件出错 {filepath}: {str(e)}")
                     continue
                     
-                # 每隔100个文件，强制垃圾回收一次，防止内存占用过高
-                if i % 100 == 0:
-                    import gc
-                    gc.collect()
-                    
             except Exception as e:
                 self.logger.error(f"文件处理异常 {filepath}: {str(e)}")
                 # 发布提取错误事件但继续处理
@@ -172,17 +251,17 @@ class TranslationExtractor:
         # 确保最终进度为100%
         self.update_progress(total_files, total_files)
         
+        self.log(f"从{len(file_entries)}个文件中提取了{extracted_count}个有效文本条目")
+        
         return file_entries
     
     def _generate_translation_files(self, file_entries: Dict[str, List[Tuple[int, str]]], 
                                    translation_dir: str) -> int:
         """生成翻译文件，返回生成的条目数"""
-        total_entries = 0
         generated_entries = 0
         
         # 计算总条目数
-        for entries in file_entries.values():
-            total_entries += len(entries)
+        total_entries = sum(map(len, file_entries.values()))
         
         if total_entries == 0:
             self.log("没有找到需要翻译的文本")
@@ -190,50 +269,54 @@ class TranslationExtractor:
             
         self.log(f"找到{total_entries}个需要翻译的文本条目")
         
-        # 处理每个文件
-        file_count = 0
-        for src_file, entries in file_entries.items():
-            if not entries:
-                continue
-                
-            # 计算相对路径
-            rel_path = os.path.relpath(src_file, os.path.join(self.config.game_dir, "game"))
-            dst_file = os.path.join(translation_dir, rel_path)
-            
-            # 读取已有翻译（如果存在）
-            new_entries = entries
-            if os.path.exists(dst_file) and self.config.skip_translated:
-                try:
-                    with open(dst_file, 'r', encoding=self.config.encoding) as f:
-                        content = f.read()
-                    
-                    # 提取已存在的翻译条目
-                    existing_entries = set()
-                    for match in re.finditer(r'old\s+(?:"([^"\\]*(?:\\.[^"\\]*)*)"|"""([\s\S]*?)""")', content):
-                        text = match.group(1) if match.group(1) is not None else match.group(2)
-                        existing_entries.add(text.strip())
+        # 在写入会话中生成所有文件，覆盖模式下会先清空翻译目录，再读取已有翻译
+        with self.writer_factory.session(self.config):
+            # 先依次确定每个文件需要写入的条目
+            jobs = []
+            for src_file, entries in file_entries.items():
+                if not entries:
+                    continue
                     
-                    # 过滤掉已存在的条目
-                    new_entries = [(line, text) for line, text in entries 
-                                  if text.strip() not in existing_entries]
-                except Exception as e:
-                    self.logger.warning(f"读取已有翻译文件失败 {dst_file}: {str(e)}")
-            
-            if not new_entries:
-                continue
+                # 计算相对路径
+                rel_path = os.path.relpath(src_file, os.path.join(self.config.game_dir, "game"))
+                dst_file = os.path.join(translation_dir, rel_path)
+                
+                # 读取已有翻译（如果存在）
+                new_entries = entries
+                if os.path.exists(dst_file) and self.config.skip_translated:
+                    try:
+                        with open(dst_file, 'r', encoding=self.config.encoding) as f:
+                            content = f.read()
+                        
+                        # 提取已存在的翻译条目
+                        existing_entries = set()
+                        for match in _OLD_STRING_RE.finditer(content):
+                            text = match.group(1) if match.group(1) is not None else match.group(2)
+                            existing_entries.add(text.strip())
+                        
+                        # 过滤掉已存在的条目
+                        new_entries = [(line, text) for line, text in entries 
+                                      if text.strip() not in existing_entries]
+                    except Exception as e:
+                        self.logger.warning(f"读取已有翻译文件失败 {dst_file}: {str(e)}")
                 
-            # 使用写入工厂写入翻译文件，只支持renpy格式
-            success = self.writer_factory.write_translation_file(
-                "renpy", dst_file, new_entries, rel_path, self.config
-            )
+                if not new_entries:
+                    continue
+                    
+                jobs.append(("renpy", dst_file, new_entries, rel_path, self.config))
             
+            # 各文件的写入互不相关，由写入工厂并行写入，只支持renpy格式
+            # 写入线程数使用写入工厂的默认值，max_threads只控制提取的并行进程数
+            results = self.writer_factory.batch_write(jobs)
+        
+        # 按文件顺序汇总写入结果
+        file_count = 0
+        for (_, _, new_entries, rel_path, _), success in zip(jobs, results):
             if success:
                 file_count += 1
                 generated_entries += len(new_entries)
+                # 文件保存事件已由写入器在写入成功时发布，这里不再重复发布
                 self.log(f"已生成翻译文件: {rel_path} ({len(new_entries)}个条目)")
-                
-                # 发布文件保存事件
-                publish(EventNames.FILE_SAVED, filepath=dst_file, entry_count=len(new_entries))
         
         self.log(f"总计处理了{file_count}个文件，生成了{generated_entries}个翻译条目")
         return generated_entries
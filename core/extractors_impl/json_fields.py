@@ -3,75 +3,145 @@
 """
 import json
 import re
-from typing import List, Tuple, Dict, Any, Union, Optional
+from typing import AbstractSet, List, Tuple, Dict, Any, Iterable, Union, Optional
 
-def extract_field_from_json(json_data: Union[Dict[Any, Any], List[Any]], field_name: str, 
-                           path: str = "", level: int = 1, 
-                           result: Optional[List[Tuple[int, str]]] = None) -> List[Tuple[int, str]]:
+# JSON单行注释模式: // 注释内容
+# 字符串字面量作为第一个分支一并匹配并原样保留，字符串中的"//"（例如URL）不会被当作注释
+_LINE_COMMENT_RE = re.compile(r'("(?:[^"\\\n]|\\.)*")|//[^\n]*')
+
+def extract_fields_from_json(json_data: Union[Dict[Any, Any], List[Any]], field_names: AbstractSet[str], 
+                             level: int = 1, 
+                             result: Optional[List[Tuple[int, str]]] = None) -> List[Tuple[int, str]]:
     """
-    递归提取JSON数据中的指定字段
+    一次遍历提取JSON数据中的多个字段
+    
+    使用显式栈代替递归遍历，嵌套再深也不会触发递归深度限制；
+    栈中保存各层的子元素迭代器，遍历顺序与递归实现一致
     
     Args:
         json_data: JSON数据（字典或列表）
-        field_name: 要提取的字段名
-        path: 当前JSON路径（用于调试）
+        field_names: 要提取的字段名集合
         level: 当前嵌套层级（用作行号）
         result: 结果列表，格式为(行号, 文本)
         
     Returns:
-        提取的文本列表，格式为(行号, 文本)
+        按出现顺序排列的文本列表，格式为(行号, 文本)
     """
     if result is None:
         result = []
     
-    # 处理字典类型
+    if not isinstance(json_data, (dict, list)):
+        return result
+    
+    # 热循环中使用的方法提前绑定为局部变量
+    append = result.append
+    
+    # 栈元素: (是否为字典, 子元素迭代器, 当前层级)
     if isinstance(json_data, dict):
-        for key, value in json_data.items():
-            current_path = f"{path}.{key}" if path else key
-            
-            # 检查当前键是否匹配目标字段
-            if key == field_name and isinstance(value, str):
-                # 使用当前层级作为行号
-                result.append((level, value))
-            
-            # 递归处理嵌套对象
-            if isinstance(value, (dict, list)):
-                extract_field_from_json(value, field_name, current_path, level + 1, result)
+        stack = [(True, iter(json_data.items()), level)]
+    else:
+        stack = [(False, iter(json_data), level)]
+    push = stack.append
+    pop = stack.pop
     
-    # 处理列表类型
-    elif isinstance(json_data, list):
-        for i, item in enumerate(json_data):
-            current_path = f"{path}[{i}]"
-            if isinstance(item, (dict, list)):
-                extract_field_from_json(item, field_name, current_path, level + 1, result)
+    while stack:
+        is_dict, items, current_level = stack[-1]
+        child_level = current_level + 1
+        
+        # 遇到嵌套对象时先处理子对象，处理完后继续当前层
+        if is_dict:
+            for key, value in items:
+                # 检查当前键是否匹配目标字段，使用当前层级作为行号
+                if key in field_names and isinstance(value, str):
+                    append((current_level, value))
+                if isinstance(value, dict):
+                    push((True, iter(value.items()), child_level))
+                    break
+                if isinstance(value, list):
+                    push((False, iter(value), child_level))
+                    break
+            else:
+                # 当前层已遍历完毕
+                pop()
+        else:
+            for value in items:
+                if isinstance(value, dict):
+                    push((True, iter(value.items()), child_level))
+                    break
+                if isinstance(value, list):
+                    push((False, iter(value), child_level))
+                    break
+            else:
+                # 当前层已遍历完毕
+                pop()
     
     return result
 
-def extract_display_name(content: str, filepath: str) -> List[Tuple[int, str]]:
+def extract_field_from_json(json_data: Union[Dict[Any, Any], List[Any]], field_name: str, 
+                           path: str = "", level: int = 1, 
+                           result: Optional[List[Tuple[int, str]]] = None) -> List[Tuple[int, str]]:
     """
-    提取JSON文件中的display_name字段值
+    提取JSON数据中的指定字段
+    
+    Args:
+        json_data: JSON数据（字典或列表）
+        field_name: 要提取的字段名
+        path: 已不再使用，仅为兼容旧的调用方式保留
+        level: 当前嵌套层级（用作行号）
+        result: 结果列表，格式为(行号, 文本)
+        
+    Returns:
+        提取的文本列表，格式为(行号, 文本)
+    """
+    return extract_fields_from_json(json_data, frozenset((field_name,)), level, result)
+
+def _load_json(content: str) -> Any:
+    """
+    解析JSON内容，支持带有单行注释的JSON
+    
+    Raises:
+        json.JSONDecodeError: 移除注释后仍无法解析
+    """
+    try:
+        # 大多数JSON文件不含注释，先直接解析，省去注释处理的整遍扫描，
+        # 也不会把字符串中的"//"（例如URL）误当作注释删除
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # 解析失败时移除JSON注释后重试，字符串分组原样写回，注释分组未匹配时替换为空
+        content = _LINE_COMMENT_RE.sub(r'\1', content)
+        return json.loads(content)
+
+def extract_json_fields(content: str, filepath: str, field_names: Iterable[str]) -> List[Tuple[int, str]]:
+    """
+    解析一次JSON文件并在一次遍历中提取多个字段值
     
     Args:
         content: JSON文件内容
         filepath: 文件路径(用于日志)
+        field_names: 要提取的字段名列表
         
     Returns:
         提取的(行号, 文本内容)列表，行号表示JSON嵌套层级
     """
     try:
-        # 移除JSON注释 (如果存在)
-        # 这里处理两种常见的JSON注释格式
-        # 单行注释: // 注释内容
-        content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)
-        
-        # 解析JSON
-        json_data = json.loads(content)
-        
-        # 提取display_name字段
-        return extract_field_from_json(json_data, "display_name")
+        json_data = _load_json(content)
+        return extract_fields_from_json(json_data, frozenset(field_names))
     except json.JSONDecodeError:
         # 如果JSON解析失败，返回空列表
         return []
     except Exception:
         # 其他异常处理
         return []
+
+def extract_display_name(content: str, filepath: str) -> List[Tuple[int, str]]:
+    """
+    提取JSON文件中的display_name字段值
+    
+    Args:
+        content: JSON文件内容
+        filepath: 文件路径(用于日志)
+        
+    Returns:
+        提取的(行号, 文本内容)列表，行号表示JSON嵌套层级
+    """
+    return extract_json_fields(content, filepath, ("display_name",))
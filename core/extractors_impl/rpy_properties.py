@@ -2,18 +2,126 @@
 用于提取RPY文件中的特定属性值：description, purchase_notification, unlock_notification
 """
 import re
-from typing import List, Tuple
+from itertools import chain, combinations
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Match, Optional, Pattern, Tuple, Union
 from ..regex.rpy_patterns import (
-    DESCRIPTION_PATTERN, 
-    PURCHASE_NOTIFICATION_PATTERN, 
-    UNLOCK_NOTIFICATION_PATTERN,
-    MULTILINE_COMMENT_PATTERN,
-    SINGLE_LINE_COMMENT_PATTERN
+    COMMENT_RE,
+    compile_fused_property_pattern
 )
 
+# 内置支持的属性名称，可合并为单次扫描
+RPY_PROPERTIES = ("description", "purchase_notification", "unlock_notification")
+
+def precompile_properties(property_names: Iterable[str]) -> None:
+    """
+    预先编译属性组合的正则表达式
+    
+    提取时只保留内容中出现的属性，可能用到名称列表的任意保序子集，
+    在并行提取的子进程启动时一并编译，避免每个进程处理文件时再编译
+    
+    Args:
+        property_names: 要提取的属性名称列表
+    """
+    names = tuple(dict.fromkeys(property_names))
+    for size in range(1, len(names) + 1):
+        for subset in combinations(names, size):
+            compile_fused_property_pattern(subset)
+
+def _get_comment_ranges(content: str) -> Tuple[List[int], List[int]]:
+    """
+    获取所有注释的范围，以便排除
+    
+    多行注释和单行注释合并为一个模式，只扫描一遍内容；
+    从左到右匹配得到的区间本身有序且互不重叠，无需再排序合并
+    
+    Returns:
+        按起点排序的(起点列表, 终点列表)
+    """
+    starts: List[int] = []
+    ends: List[int] = []
+    for m in COMMENT_RE.finditer(content):
+        starts.append(m.start())
+        ends.append(m.end())
+    
+    return starts, ends
+
+def _parse_string_value(value: str) -> Optional[str]:
+    """
+    去除字符串字面量的前缀和引号
+    
+    Returns:
+        字符串内容，空字符串返回None
+    """
+    # 处理f-string前缀
+    if value[0] == 'f':
+        value = value[1:]
+    
+    # 处理不同的引号类型，正则已保证首尾引号配对，只需检查开头
+    head = value[:3]
+    if head == '"""' or head == "'''":
+        text = value[3:-3]
+    else:
+        # 单引号或双引号
+        text = value[1:-1]
+    
+    # 过滤空字符串
+    if text and text.strip():
+        return text
+    return None
+
+def _collect_entries(content: str, matches: Iterator[Match]) -> List[Tuple[int, str]]:
+    """
+    从属性匹配结果中收集不在注释内的(行号, 文本内容)
+    
+    Args:
+        content: 文件内容
+        matches: 按位置排序的匹配迭代器，属性值由第1个分组捕获
+    
+    Returns:
+        按出现位置排序的(行号, 文本内容)列表
+    """
+    # 没有匹配时无需扫描注释
+    first = next(matches, None)
+    if first is None:
+        return []
+    
+    entries = []
+    comment_starts, comment_ends = _get_comment_ranges(content)
+    comment_count = len(comment_starts)
+    comment_index = 0
+    
+    # 匹配位置单调递增，行号只需统计上一个匹配到当前匹配之间的换行符
+    line_num = 1
+    line_pos = 0
+    
+    # 循环中频繁调用的方法提前绑定为局部变量
+    append = entries.append
+    count_newlines = content.count
+    
+    for match in chain((first,), matches):
+        pos = match.start()
+        
+        # 检查是否在注释范围内：找到第一个终点不早于当前位置的注释区间，
+        # 上次的结果作为二分查找的下界，该区间起点不晚于当前位置时即位于注释内
+        comment_index = bisect_left(comment_ends, pos, comment_index)
+        if comment_index < comment_count and comment_starts[comment_index] <= pos:
+            continue
+        
+        # 计算行号（从1开始）
+        line_num += count_newlines('\n', line_pos, pos)
+        line_pos = pos
+        
+        # 提取文本值
+        text = _parse_string_value(match[1])
+        if text is not None:
+            append((line_num, text))
+    
+    return entries
+
 def extract_property_values(content: str, 
                            filepath: str, 
-                           pattern: str,
+                           pattern: Union[Pattern, str],
                            property_name: str) -> List[Tuple[int, str]]:
     """
     通用属性值提取函数
@@ -21,65 +129,46 @@ def extract_property_values(content: str,
     Args:
         content: 文件内容
         filepath: 文件路径
-        pattern: 正则表达式模式
+        pattern: 正则表达式模式，如rpy_patterns中的DESCRIPTION_PATTERN，也可以是预编译的正则表达式
         property_name: 属性名称（用于日志）
-        
+    
     Returns:
         提取的(行号, 文本内容)列表
     """
-    entries = []
-    
-    # 获取所有注释的范围，以便排除
-    comment_ranges = []
+    return _collect_entries(content, re.finditer(pattern, content))
+
+def extract_properties(content: str,
+                       filepath: str,
+                       property_names: Iterable[str]) -> List[Tuple[int, str]]:
+    """
+    单次扫描提取多个属性值
     
-    # 匹配多行注释
-    for m in re.finditer(MULTILINE_COMMENT_PATTERN, content, re.MULTILINE):
-        comment_ranges.append((m.start(), m.end()))
+    内容中出现的属性名合并为一个交替分支的正则表达式，文件内容只需扫描一遍
     
-    # 匹配单行注释
-    for m in re.finditer(SINGLE_LINE_COMMENT_PATTERN, content, re.MULTILINE):
-        comment_ranges.append((m.start(), m.end()))
+    Args:
+        content: 文件内容
+        filepath: 文件路径
+        property_names: 要提取的属性名称列表
     
-    # 查找所有匹配的属性值
-    for match in re.finditer(pattern, content):
-        # 检查是否在注释范围内
-        is_in_comment = any(start <= match.start() <= end for start, end in comment_ranges)
-        if is_in_comment:
-            continue
-        
-        # 计算行号
-        line_num = content.count('\n', 0, match.start()) + 1
-        
-        # 提取文本值
-        value = match.group(1)
-        
-        # 处理f-string前缀
-        if value.startswith('f'):
-            value = value[1:]
-        
-        # 处理不同的引号类型
-        if value.startswith('"""') and value.endswith('"""'):
-            text = value[3:-3]
-        elif value.startswith("'''") and value.endswith("'''"):
-            text = value[3:-3]
-        else:
-            # 单引号或双引号
-            text = value[1:-1]
-        
-        # 过滤空字符串
-        if text and text.strip():
-            entries.append((line_num, text))
+    Returns:
+        按出现位置排序的(行号, 文本内容)列表
+    """
+    # 只保留内容中实际出现的属性，交替分支越少正则扫描越快，
+    # 字符串查找的开销远小于正则扫描
+    names = tuple(name for name in dict.fromkeys(property_names) if name in content)
+    if not names:
+        return []
     
-    return entries
+    return _collect_entries(content, compile_fused_property_pattern(names).finditer(content))
 
 def extract_description(content: str, filepath: str) -> List[Tuple[int, str]]:
     """提取description属性值"""
-    return extract_property_values(content, filepath, DESCRIPTION_PATTERN, "description")
+    return extract_properties(content, filepath, ("description",))
 
 def extract_purchase_notification(content: str, filepath: str) -> List[Tuple[int, str]]:
     """提取purchase_notification属性值"""
-    return extract_property_values(content, filepath, PURCHASE_NOTIFICATION_PATTERN, "purchase_notification")
+    return extract_properties(content, filepath, ("purchase_notification",))
 
 def extract_unlock_notification(content: str, filepath: str) -> List[Tuple[int, str]]:
     """提取unlock_notification属性值"""
-    return extract_property_values(content, filepath, UNLOCK_NOTIFICATION_PATTERN, "unlock_notification")
+    return extract_properties(content, filepath, ("unlock_notification",))
@@ -2,14 +2,70 @@
 提取工厂类
 负责创建和管理文本提取器
 """
-from typing import Dict, Callable, List, Tuple, Optional
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Callable, FrozenSet, Iterable, Iterator, List, NamedTuple, Tuple, Optional
 from ..extractors_impl.rpy_properties import (
+    RPY_PROPERTIES,
     extract_description,
+    extract_properties,
     extract_purchase_notification,
-    extract_unlock_notification
+    extract_unlock_notification,
+    precompile_properties
 )
-from ..extractors_impl.json_fields import extract_display_name
-from ..logger import get_logger
+from ..extractors_impl.json_fields import extract_display_name, extract_json_fields
+from ..logger import get_logger, init_worker_logger
+
+# Ren'Py脚本和JSON数据文件的扩展名
+_RPY_EXTENSIONS = frozenset({".rpy", ".rpym"})
+_JSON_EXTENSIONS = frozenset({".json"})
+
+# 内置提取器 {提取器名称: 提取器函数}，并行提取时子进程新建的工厂只包含这些提取器
+_BUILTIN_EXTRACTORS: Dict[str, Callable[[str, str], List[Tuple[int, str]]]] = {
+    "description": extract_description,
+    "purchase_notification": extract_purchase_notification,
+    "unlock_notification": extract_unlock_notification,
+    "json_display_name": extract_display_name,
+}
+
+class _ExtractionPlan(NamedTuple):
+    """一组提取器名称在某类文件上的提取计划"""
+    properties: Tuple[str, ...]         # 合并为一次扫描的RPY属性名称
+    json_fields: FrozenSet[str]         # 合并为一次解析和遍历的JSON字段名称
+    extractors: List[Tuple[str, Callable[[str, str], List[Tuple[int, str]]]]]  # 需单独执行的(提取器名称, 提取器函数)
+    keywords: Optional[Tuple[bytes, ...]]  # 产生结果所需的关键字，存在无法预先判断的提取器时为None
+
+def _read_file_bytes(filepath: str) -> bytes:
+    """一次性读取整个文件的原始字节"""
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+def _decode_text(raw: bytes, encoding: str) -> str:
+    """
+    将原始字节一次解码为文本
+    
+    避免文本流逐块解码的开销；换行符处理与文本模式读取保持一致，统一转换为LF
+    """
+    content = raw.decode(encoding, errors='replace')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+@lru_cache(maxsize=None)
+def _is_ascii_compatible(encoding: str) -> bool:
+    """判断编码是否兼容ASCII，兼容时ASCII关键字在原始字节中的形式不变（允许BOM前缀）"""
+    probe = "abcdefghijklmnopqrstuvwxyz_"
+    try:
+        return probe.encode(encoding).endswith(probe.encode("ascii"))
+    except LookupError:
+        return False
 
 class ExtractorFactory:
     """
@@ -19,13 +75,22 @@ class ExtractorFactory:
     
     def __init__(self) -> None:
         self.logger = get_logger()
-        # 初始化提取器，添加新的JSON提取器
-        self.extractors: Dict[str, Callable[[str, str], List[Tuple[int, str]]]] = {
-            "description": extract_description,
-            "purchase_notification": extract_purchase_notification,
-            "unlock_notification": extract_unlock_notification,
-            "json_display_name": extract_display_name,  # 新增JSON提取器
-        }
+        # 初始化提取器，包括RPY属性提取器和JSON提取器
+        self.extractors: Dict[str, Callable[[str, str], List[Tuple[int, str]]]] = dict(_BUILTIN_EXTRACTORS)
+        # 可合并为单次扫描的RPY属性提取器 {提取器名称: 属性名称}
+        self.property_extractors: Dict[str, str] = {name: name for name in RPY_PROPERTIES}
+        # 可合并为单次解析和遍历的JSON字段提取器 {提取器名称: 字段名称}
+        self.json_field_extractors: Dict[str, str] = {"json_display_name": "display_name"}
+        # 内置提取器不适用的文件扩展名 {提取器名称: 扩展名集合}，遇到这些文件时直接跳过扫描
+        # 未列出的提取器（包括自定义提取器）对所有文件生效
+        self.excluded_extensions: Dict[str, FrozenSet[str]] = {name: _JSON_EXTENSIONS for name in RPY_PROPERTIES}
+        self.excluded_extensions["json_display_name"] = _RPY_EXTENSIONS
+        # 内置提取器有匹配结果时内容中必然出现的ASCII关键字 {提取器名称: 关键字}
+        # 用于在解码前跳过无关文件；未列出的提取器（包括自定义提取器）无法预先判断
+        self.extractor_keywords: Dict[str, bytes] = {name: name.encode("ascii") for name in RPY_PROPERTIES}
+        self.extractor_keywords["json_display_name"] = b"display_name"
+        # 提取计划缓存 {(提取器名称元组, 文件扩展名): 提取计划}，注册或注销提取器时清空
+        self._plan_cache: Dict[Tuple[Tuple[str, ...], str], _ExtractionPlan] = {}
         self.logger.debug(f"提取工厂初始化完成，加载了 {len(self.extractors)} 个提取器")
     
     def get_extractor(self, name: str) -> Optional[Callable[[str, str], List[Tuple[int, str]]]]:
@@ -84,6 +149,8 @@ class ExtractorFactory:
             self.logger.warning(f"提取器 '{name}' 已存在，将被覆盖")
         
         self.extractors[name] = extractor
+        # 被覆盖的内置提取器不再参与合并扫描
+        self._discard_builtin(name)
         self.logger.debug(f"成功注册提取器 '{name}'")
         return True
     
@@ -99,10 +166,99 @@ class ExtractorFactory:
         """
         if name in self.extractors:
             del self.extractors[name]
+            self._discard_builtin(name)
             self.logger.debug(f"成功注销提取器 '{name}'")
             return True
         return False
     
+    def _discard_builtin(self, name: str) -> None:
+        """移除内置提取器的合并扫描、扩展名和关键字信息，并使提取计划缓存失效"""
+        self.property_extractors.pop(name, None)
+        self.json_field_extractors.pop(name, None)
+        self.excluded_extensions.pop(name, None)
+        self.extractor_keywords.pop(name, None)
+        self._plan_cache.clear()
+    
+    def _get_extraction_plan(self, extractor_names: List[str], extension: str) -> _ExtractionPlan:
+        """
+        获取提取器名称列表在指定类型文件上的提取计划
+        
+        同一组名称在同类文件上的拆分结果都相同，只需解析一次；
+        不适用于该类文件的内置提取器不会出现在计划中
+        
+        Args:
+            extractor_names: 提取器名称列表
+            extension: 小写的文件扩展名
+        
+        Returns:
+            提取计划
+        """
+        key = (tuple(extractor_names), extension)
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            properties = []
+            json_fields = []
+            extractors = []
+            keywords: Optional[List[bytes]] = []
+            for name in key[0]:
+                if extension in self.excluded_extensions.get(name, ()):
+                    continue
+                
+                if keywords is not None:
+                    keyword = self.extractor_keywords.get(name)
+                    if keyword is None:
+                        keywords = None
+                    else:
+                        keywords.append(keyword)
+                
+                # 内置属性提取器合并到一次扫描中执行
+                if name in self.property_extractors:
+                    properties.append(self.property_extractors[name])
+                    continue
+                
+                # 内置JSON字段提取器合并到一次解析和遍历中执行
+                if name in self.json_field_extractors:
+                    json_fields.append(self.json_field_extractors[name])
+                    continue
+                
+                extractor = self.get_extractor(name)
+                if extractor:
+                    extractors.append((name, extractor))
+            plan = self._plan_cache[key] = _ExtractionPlan(
+                tuple(properties), frozenset(json_fields), extractors,
+                tuple(keywords) if keywords is not None else None
+            )
+        return plan
+    
+    def prepare(self, extractor_names: List[str], extensions: Iterable[str]) -> None:
+        """
+        预先生成各类文件的提取计划并编译所需的正则表达式
+        
+        Args:
+            extractor_names: 要使用的提取器名称列表
+            extensions: 要处理的文件扩展名
+        """
+        for extension in extensions:
+            plan = self._get_extraction_plan(extractor_names, extension.lower())
+            if plan.properties:
+                precompile_properties(plan.properties)
+    
+    def get_required_keywords(self, filepath: str, extractor_names: List[str]) -> Optional[Tuple[bytes, ...]]:
+        """
+        获取文件可能产生提取结果所需的关键字
+        
+        内容中一个关键字都不包含时，所有提取器都不会有结果，可以跳过解码和提取
+        
+        Args:
+            filepath: 文件路径
+            extractor_names: 要使用的提取器名称列表
+            
+        Returns:
+            ASCII关键字元组；存在无法预先判断的提取器时返回None
+        """
+        extension = os.path.splitext(filepath)[1].lower()
+        return self._get_extraction_plan(extractor_names, extension).keywords
+    
     def extract_from_content(self, content: str, filepath: str, extractor_names: List[str]) -> List[Tuple[int, str]]:
         """
         使用指定的提取器从内容中提取文本
@@ -116,12 +272,144 @@ class ExtractorFactory:
             提取的文本元组列表 [(行号, 文本)]
         """
         result = []
-        for name in extractor_names:
-            extractor = self.get_extractor(name)
-            if extractor:
-                entries = extractor(content, filepath)
-                if entries:
-                    result.extend(entries)
-                    self.logger.debug(f"使用提取器 '{name}' 从 {filepath} 提取了 {len(entries)} 个条目")
+        extension = os.path.splitext(filepath)[1].lower()
+        plan = self._get_extraction_plan(extractor_names, extension)
+        for name, extractor in plan.extractors:
+            entries = extractor(content, filepath)
+            if entries:
+                result.extend(entries)
+                self.logger.debug("使用提取器 '%s' 从 %s 提取了 %d 个条目", name, filepath, len(entries))
+        
+        if plan.json_fields:
+            entries = extract_json_fields(content, filepath, plan.json_fields)
+            if entries:
+                result.extend(entries)
+                self.logger.debug("使用JSON字段提取器 %s 从 %s 提取了 %d 个条目", sorted(plan.json_fields), filepath, len(entries))
+        
+        if plan.properties:
+            entries = extract_properties(content, filepath, plan.properties)
+            if entries:
+                result.extend(entries)
+                self.logger.debug("使用属性提取器 %s 从 %s 提取了 %d 个条目", list(plan.properties), filepath, len(entries))
         
         return result
+    
+    def extract_file(self, filepath: str, encoding: str, extractor_names: List[str]) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        读取并提取单个文件
+        
+        解码前先在原始字节中查找提取器关键字，一个都不包含的文件不可能有提取结果，
+        直接跳过解码和提取
+        
+        Args:
+            filepath: 文件路径
+            encoding: 文件编码
+            extractor_names: 要使用的提取器名称列表
+            
+        Returns:
+            (文件内容长度, 提取的(行号, 文本)列表)，跳过解码时内容长度为字节数
+        """
+        raw = _read_file_bytes(filepath)
+        
+        keywords = self.get_required_keywords(filepath, extractor_names)
+        if keywords is not None and _is_ascii_compatible(encoding):
+            if not any(keyword in raw for keyword in keywords):
+                return len(raw), []
+        
+        content = _decode_text(raw, encoding)
+        return len(content), self.extract_from_content(content, filepath, extractor_names)
+    
+    def _uses_builtin_only(self, extractor_names: List[str]) -> bool:
+        """
+        判断名称列表中的提取器是否都是未被覆盖的内置提取器
+        
+        子进程中新建的工厂只包含内置提取器，只有这种情况下并行提取的结果才与本工厂一致
+        """
+        return all(name in _BUILTIN_EXTRACTORS and self.extractors.get(name) is _BUILTIN_EXTRACTORS[name]
+                   for name in extractor_names)
+    
+    def extract_batch(self, filepaths: List[str], extractor_names: List[str], encoding: str,
+                      workers: int = 1) -> Iterator[Tuple[int, List[Tuple[int, str]], Optional[Exception]]]:
+        """
+        按文件顺序逐个读取并提取一批文件
+        
+        workers大于1、文件多于一个且只使用未被覆盖的内置提取器时使用进程池并行处理，
+        子进程使用各自新建的工厂实例；否则在当前进程中使用本工厂依次处理，
+        注册或覆盖的提取器不会因为并行而被忽略。
+        单个文件的异常作为结果返回而不是抛出，不会中断整个批次；
+        进程池中途损坏时，尚未返回结果的文件改为在当前进程中依次处理
+        
+        Args:
+            filepaths: 文件路径列表
+            extractor_names: 要使用的提取器名称列表
+            encoding: 文件编码
+            workers: 最大并行进程数
+            
+        Yields:
+            (文件内容长度, 提取的(行号, 文本)列表, 异常)
+        """
+        if workers > 1 and len(filepaths) > 1 and not self._uses_builtin_only(extractor_names):
+            self.logger.debug("存在注册或覆盖的提取器，子进程中无法使用，改为在当前进程中依次提取")
+            workers = 1
+        
+        if workers > 1 and len(filepaths) > 1:
+            extensions = sorted({os.path.splitext(filepath)[1].lower() for filepath in filepaths})
+            done = 0
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(extractor_names, extensions)) as executor:
+                    for result in executor.map(_process_file, filepaths,
+                                               repeat(encoding),
+                                               repeat(extractor_names),
+                                               chunksize=16):
+                        yield result
+                        done += 1
+                return
+            except BrokenProcessPool as e:
+                # 子进程异常退出或无法启动（例如打包后的程序）时不中断整个提取，剩余文件改为依次处理
+                self.logger.warning("并行提取的进程池不可用（%s），剩余的 %d 个文件改为在当前进程中依次提取",
+                                    e, len(filepaths) - done)
+                filepaths = filepaths[done:]
+        
+        for filepath in filepaths:
+            try:
+                content_length, entries = self.extract_file(filepath, encoding, extractor_names)
+            except Exception as e:
+                yield 0, [], e
+                continue
+            yield content_length, entries, None
+
+# 子进程中复用的提取工厂，由进程池的初始化函数创建
+_worker_extractor_factory: Optional[ExtractorFactory] = None
+
+def _init_worker(extractor_names: List[str], extensions: List[str]) -> None:
+    """
+    进程池子进程的初始化函数
+    
+    创建提取工厂，并预先生成提取计划、编译正则表达式，
+    子进程处理第一批文件时不必再承担这些开销。
+    日志管理器需要在创建提取工厂之前初始化，子进程中不创建日志文件和控制台输出
+    """
+    global _worker_extractor_factory
+    init_worker_logger()
+    _worker_extractor_factory = ExtractorFactory()
+    _worker_extractor_factory.prepare(extractor_names, extensions)
+
+def _process_file(filepath: str, encoding: str,
+                  extractor_names: List[str]) -> Tuple[int, List[Tuple[int, str]], Optional[Exception]]:
+    """
+    在子进程中读取并提取单个文件
+    
+    异常作为结果返回而不是抛出，避免单个文件出错中断整个批次
+    
+    Returns:
+        (文件内容长度, 提取的(行号, 文本)列表, 异常)
+    """
+    global _worker_extractor_factory
+    try:
+        if _worker_extractor_factory is None:
+            _worker_extractor_factory = ExtractorFactory()
+        content_length, entries = _worker_extractor_factory.extract_file(filepath, encoding, extractor_names)
+        return content_length, entries, None
+    except Exception as e:
+        return 0, [], e
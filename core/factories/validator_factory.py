@@ -2,10 +2,29 @@
 验证工厂类
 负责创建和管理文本验证器
 """
-from typing import Dict, Callable, List, Optional, Any, Set
+import re
+from typing import Dict, Callable, List, Optional, Set, Tuple
 
 from ..logger import get_logger
 
+# 字母或数字：不属于非单词字符且不是下划线，与str.isalnum()的判断一致
+_ALNUM_RE = re.compile(r'[^\W_]')
+
+# 内置验证器的执行顺序，开销小的先执行，尽早淘汰无效文本；
+# 全局去重会记录见过的文本，必须最后执行，只记录通过了其他所有验证的文本
+_VALIDATOR_ORDER = {
+    "non_empty": 0,
+    "no_invalid_chars": 1,
+    "has_alphanumeric": 2,
+    "string_consistency": 3,
+    "global_deduplicate": 9
+}
+# 自定义验证器排在内置的无状态验证器之后、全局去重之前
+_CUSTOM_VALIDATOR_ORDER = 5
+
+# 反斜杠及其转义的下一个字符（包括换行和另一个反斜杠）
+_ESCAPE_SEQUENCE_RE = re.compile(r'\\.', re.DOTALL)
+
 class ValidatorFactory:
     """
     验证工厂类
@@ -32,12 +51,13 @@ class ValidatorFactory:
     
     def _validate_has_alphanumeric(self, text: str) -> bool:
         """验证文本包含字母或数字"""
-        return any(c.isalnum() for c in text)
+        # 由正则引擎在C层面扫描，找到第一个字母或数字即返回
+        return _ALNUM_RE.search(text) is not None
     
     def _validate_no_invalid_chars(self, text: str) -> bool:
         """验证文本不包含无效字符"""
-        invalid_chars = ['\0', '\ufffd']  # 空字符和替换字符
-        return not any(c in text for c in invalid_chars)
+        # 空字符和替换字符，直接使用字符串查找，比逐个字符生成器判断快得多
+        return '\0' not in text and '\ufffd' not in text
     
     def _validate_string_consistency(self, text: str) -> bool:
         """
@@ -45,32 +65,24 @@ class ValidatorFactory:
         
         简化实现：只检查基本的语法平衡，不干扰游戏中使用的任何变量或标记
         """
-        # 检查引号和花括号是否平衡
-        brackets = {'"': 0, "'": 0, "{": 0, "}": 0}
-        escape_flag = False
-        
-        # 简单遍历字符串，检查引号和花括号是否平衡
-        for char in text:
-            if escape_flag:
-                escape_flag = False
-                continue
-                
-            if char == '\\':
-                escape_flag = True
-            elif char in brackets:
-                brackets[char] += 1
+        # 反斜杠转义的字符不参与计数，先整体移除转义序列，没有反斜杠时无需处理
+        counted = _ESCAPE_SEQUENCE_RE.sub('', text) if '\\' in text else text
+        
+        # 检查引号和花括号是否平衡，str.count在C层面扫描，无需逐个字符遍历
+        brackets = {'"': counted.count('"'), "'": counted.count("'"),
+                    "{": counted.count("{"), "}": counted.count("}")}
         
         # 确保引号成对
         if brackets['"'] % 2 != 0:
-            self.logger.debug(f"文本 '{text[:30]}...' 中的双引号不平衡")
+            self.logger.debug("文本 '%s...' 中的双引号不平衡", text[:30])
             return False
         if brackets["'"] % 2 != 0:
-            self.logger.debug(f"文本 '{text[:30]}...' 中的单引号不平衡")
+            self.logger.debug("文本 '%s...' 中的单引号不平衡", text[:30])
             return False
         
         # 确保花括号成对
         if brackets["{"] != brackets["}"]:
-            self.logger.debug(f"文本 '{text[:30]}...' 中的花括号不平衡: {{ = {brackets['{']}, }} = {brackets['}']}")
+            self.logger.debug("文本 '%s...' 中的花括号不平衡: { = %d, } = %d", text[:30], brackets['{'], brackets['}'])
             return False
         
         # 所有检查都通过
@@ -84,13 +96,28 @@ class ValidatorFactory:
         normalized_text = text.strip()
         
         if normalized_text in self._seen_texts:
-            self.logger.debug(f"文本 '{text[:30]}...' 已存在，被全局去重验证器拒绝")
+            self.logger.debug("文本 '%s...' 已存在，被全局去重验证器拒绝", text[:30])
             return False
         
         # 添加到已见过的文本集合
         self._seen_texts.add(normalized_text)
         return True
     
+    def deduplicates_globally(self, names: List[str]) -> bool:
+        """
+        判断名称列表是否启用了内置的全局去重验证器
+        
+        启用时通过验证的文本去除首尾空白后互不相同，原文自然也不会重复
+        
+        Args:
+            names: 验证器名称列表
+            
+        Returns:
+            是否启用了内置的全局去重验证器
+        """
+        return ("global_deduplicate" in names
+                and self.validators.get("global_deduplicate") == self._validate_global_deduplicate)
+    
     def reset_deduplication(self) -> None:
         """
         重置去重状态，清空已见过的文本集合
@@ -122,6 +149,39 @@ class ValidatorFactory:
         """
         return self.validators.copy()
     
+    def get_validators_by_names(self, names: List[str]) -> Dict[str, Callable[[str], bool]]:
+        """
+        根据名称列表获取验证器
+        
+        Args:
+            names: 验证器名称列表
+            
+        Returns:
+            匹配的验证器字典，保持名称列表的顺序
+        """
+        result = {}
+        for name in names:
+            validator = self.get_validator(name)
+            if validator:
+                result[name] = validator
+        return result
+    
+    def get_validator_chain(self, names: List[str]) -> Tuple[Tuple[str, Callable[[str], bool]], ...]:
+        """
+        根据名称列表获取按执行顺序排列的验证器
+        
+        开销小的验证器排在前面，全局去重排在最后；
+        同一顺序的验证器保持名称列表中的先后顺序
+        
+        Args:
+            names: 验证器名称列表
+            
+        Returns:
+            (名称, 验证器)元组
+        """
+        validators = self.get_validators_by_names(names).items()
+        return tuple(sorted(validators, key=lambda item: _VALIDATOR_ORDER.get(item[0], _CUSTOM_VALIDATOR_ORDER)))
+    
     def register_validator(self, name: str, validator: Callable[[str], bool]) -> bool:
         """
         注册新的验证器
@@ -167,13 +227,14 @@ class ValidatorFactory:
         Returns:
             验证是否通过
         """
+        # 与提取流程使用同样的验证器链，按开销从小到大执行，全局去重最后执行
         if validator_names is None:
-            validator_names = list(self.validators.keys())
+            validator_names = list(self.validators)
+        validators = self.get_validator_chain(validator_names)
         
-        for name in validator_names:
-            validator = self.get_validator(name)
-            if validator and not validator(text):
-                self.logger.debug(f"文本 '{text[:30]}...' 未通过验证器 '{name}'")
+        for name, validator in validators:
+            if not validator(text):
+                self.logger.debug("文本 '%s...' 未通过验证器 '%s'", text[:30], name)
                 return False
         
         return True
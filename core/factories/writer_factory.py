@@ -3,13 +3,34 @@
 负责创建和管理翻译文件写入器
 """
 import os
-import re
-import glob
-import shutil
-from typing import Dict, Callable, List, Optional, Tuple, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Callable, Iterator, List, Optional, Set, Tuple, Any
 from ..logger import get_logger
 from ..events import publish, EventNames
 
+def _iter_rpy_files(directory: str) -> Iterator[str]:
+    """
+    递归遍历目录下的.rpy文件
+    
+    使用os.scandir边遍历边返回，不预先生成完整列表，也不逐个文件做通配符匹配；
+    与glob一致，忽略以点开头的隐藏文件和目录
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    for entry in entries:
+        if entry.name.startswith('.'):
+            continue
+        if entry.is_dir():
+            yield from _iter_rpy_files(entry.path)
+        elif os.path.normcase(entry.name).endswith('.rpy'):
+            yield entry.path
+
 class WriterFactory:
     """
     写入工厂类
@@ -25,6 +46,12 @@ class WriterFactory:
         self.writers: Dict[str, Callable] = {
             "renpy": self._write_renpy_translation,
         }
+        # 已确认存在的目标目录，同一目录下的多个文件只需创建一次目录
+        self._ensured_dirs: Set[str] = set()
+        # 覆盖模式下是否已清空翻译目录，由写入工厂自己记录，不再写到配置对象上
+        self._dir_cleaned = False
+        # 并行写入时保护目录确认和覆盖模式下的目录清理
+        self._lock = threading.Lock()
         self.logger.debug(f"写入工厂初始化完成，加载了 {len(self.writers)} 个写入器")
     
     def _write_renpy_translation(self, filepath: str, entries: List[Tuple[int, str]], 
@@ -46,38 +73,48 @@ class WriterFactory:
             write_mode = getattr(config, "write_mode", self.MODE_APPEND)
             
             # 确保目标目录存在
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            self._ensure_dir(os.path.dirname(filepath))
             
             # 如果是覆盖模式，先处理目录清理
             if write_mode == self.MODE_OVERWRITE:
                 self._handle_overwrite_mode(filepath, config)
             
-            # 准备文件内容
+            # 准备文件内容，各部分先收集到列表中，最后一次拼接，避免字符串反复拼接产生的复制
             file_header = 'translate schinese strings:\n\n'
-            generated_content = ''
-            
-            # 如果文件不存在或不包含标准头，添加标准头
-            if not os.path.exists(filepath) or file_header not in open(filepath, 'r', encoding=config.encoding).read():
-                generated_content = file_header
+            parts = []
+            append = parts.append
             
             # 添加新条目 - 统一使用单行文本格式
             for line_num, text in entries:
-                generated_content += f'    # {rel_path} line {line_num}\n'
-                
                 # 处理转义字符：
                 # 1. 保留原字符串中的\n换行符
                 # 2. 转义双引号
                 escaped_text = text.replace('"', '\\"')
                 
-                generated_content += f'    old "{escaped_text}"\n'
-                generated_content += f'    new ""\n\n'
+                # 每个条目由一个f-string整体生成，减少临时字符串和列表追加次数
+                append(f'    # {rel_path} line {line_num}\n'
+                       f'    old "{escaped_text}"\n'
+                       f'    new ""\n\n')
             
-            # 写入文件
-            mode = 'a' if os.path.exists(filepath) else 'w'
-            with open(filepath, mode, encoding=config.encoding) as f:
-                f.write(generated_content)
+            # 以追加读写模式只打开一次文件，既检查标准头又写入内容，文件不存在时自动创建
+            with open(filepath, 'a+', encoding=config.encoding) as f:
+                # 标准头通常位于文件开头，先只读取开头的几个字符（跳过可能存在的BOM）
+                f.seek(0)
+                prefix = f.read(len(file_header) + 1).lstrip('\ufeff')
+                
+                # 不以标准头开始的非空文件（例如Ren'Py生成的文件开头有注释）再检查整个文件，
+                # 文件中没有标准头时才添加
+                need_header = not prefix.startswith(file_header) and (
+                    not prefix or file_header not in prefix + f.read())
+                
+                # 回到文件末尾再写入：seek(0)会重置编码器，直接写入时utf-8-sig、utf-16等编码
+                # 会在文件中间再写一个BOM；定位到非空文件末尾后编码器不会再写BOM
+                f.seek(0, os.SEEK_END)
+                if need_header:
+                    f.write(file_header)
+                f.write(''.join(parts))
                 
-            self.logger.debug(f"成功写入 {len(entries)} 个翻译条目到 {filepath}")
+            self.logger.debug("成功写入 %d 个翻译条目到 %s", len(entries), filepath)
             
             # 发布文件保存事件
             publish(EventNames.FILE_SAVED, filepath=filepath, entry_count=len(entries), format="renpy")
@@ -88,31 +125,85 @@ class WriterFactory:
             self.logger.error(f"写入文件 {filepath} 失败: {str(e)}")
             return False
     
+    def _ensure_dir(self, directory: str) -> None:
+        """
+        确保目录存在
+        
+        os.makedirs会逐级检查上层目录，已确认存在的目录直接跳过；
+        可能在多个写入线程中同时调用，检查和记录在锁内完成
+        
+        Args:
+            directory: 目录路径
+        """
+        if directory in self._ensured_dirs:
+            return
+        with self._lock:
+            if directory not in self._ensured_dirs:
+                os.makedirs(directory, exist_ok=True)
+                self._ensured_dirs.add(directory)
+    
     def _handle_overwrite_mode(self, filepath: str, config: Any) -> None:
         """
         处理覆盖模式下的文件清理
         
+        多个写入线程可能同时调用，检查和清理在锁内完成，目录只会被清理一次，
+        其他线程等到清理完成后才会继续写入，不会删除已写入的文件
+        
         Args:
             filepath: 当前正在处理的文件路径
             config: 配置对象
         """
+        # 检查是否已经清理过目录（使用标记避免重复清理）
+        with self._lock:
+            if not self._dir_cleaned:
+                self._clear_translation_dir(config)
+                
+                # 设置标记，避免重复清理
+                self._dir_cleaned = True
+    
+    def _clear_translation_dir(self, config: Any) -> None:
+        """
+        清空翻译目录下的.rpy文件
+        
+        Args:
+            config: 配置对象
+        """
         # 获取翻译目录
         translation_dir = os.path.join(config.game_dir, config.translation_dir)
         
-        # 检查是否已经清理过目录（使用临时标记避免重复清理）
-        if not hasattr(config, "_dir_cleaned") or not config._dir_cleaned:
-            # 如果目录存在，直接清空rpy文件，不再创建备份
-            if os.path.exists(translation_dir):
-                try:
-                    # 清空翻译目录下的.rpy文件
-                    for rpy_file in glob.glob(os.path.join(translation_dir, "**", "*.rpy"), recursive=True):
-                        os.remove(rpy_file)
-                    self.logger.info(f"已清空翻译目录中的.rpy文件")
-                except Exception as e:
-                    self.logger.error(f"清空翻译目录时出错: {str(e)}")
-            
-            # 设置标记，避免重复清理
-            config._dir_cleaned = True
+        # 如果目录存在，直接清空rpy文件，不再创建备份
+        if os.path.exists(translation_dir):
+            try:
+                # 清空翻译目录下的.rpy文件
+                for rpy_file in _iter_rpy_files(translation_dir):
+                    os.remove(rpy_file)
+                self.logger.info(f"已清空翻译目录中的.rpy文件")
+            except Exception as e:
+                self.logger.error(f"清空翻译目录时出错: {str(e)}")
+    
+    @contextmanager
+    def session(self, config: Any) -> Iterator[None]:
+        """
+        一次生成翻译文件的写入会话
+        
+        覆盖模式下在会话开始时一次性清空翻译目录，之后读取已有翻译和写入文件时
+        都不会再遇到上次生成的内容，会话内的写入不再逐个检查是否需要清理；
+        清理标记只在会话内有效，下次生成时会重新清空
+        
+        Args:
+            config: 配置对象
+        """
+        # 目录可能在两次生成之间被删除，每次会话重新确认
+        with self._lock:
+            self._ensured_dirs.clear()
+            if getattr(config, "write_mode", self.MODE_APPEND) == self.MODE_OVERWRITE:
+                self._clear_translation_dir(config)
+            self._dir_cleaned = True
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._dir_cleaned = False
     
     def get_writer(self, name: str) -> Optional[Callable]:
         """
@@ -153,3 +244,28 @@ class WriterFactory:
         """
         # 忽略name参数，总是使用renpy写入器
         return self._write_renpy_translation(filepath, entries, rel_path, config)
+    
+    def batch_write(self, jobs: List[Tuple[str, str, List[Tuple[int, str]], str, Any]],
+                    max_workers: Optional[int] = None) -> List[bool]:
+        """
+        并行写入多个翻译文件
+        
+        各文件的写入互不相关，文件读写期间会释放GIL，使用线程池同时写入；
+        只有一个文件或max_workers为1时在当前线程中依次写入。
+        可以在session()之外直接调用，覆盖模式下的目录清理由锁保证只执行一次
+        
+        Args:
+            jobs: 写入任务列表 [(写入器名称, 目标文件路径, 条目列表, 源文件相对路径, 配置对象)]，
+                  目标文件路径不能重复
+            max_workers: 最大线程数，为None时使用写入工厂的默认值（CPU数量的4倍，最多32个）
+            
+        Returns:
+            与写入任务顺序一致的写入结果列表
+        """
+        if len(jobs) <= 1 or max_workers == 1:
+            return [self.write_translation_file(*job) for job in jobs]
+        
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda job: self.write_translation_file(*job), jobs))
@@ -5,38 +5,69 @@
 import os
 import logging
 import datetime
+import queue
+import threading
+import time
+from functools import lru_cache
 from typing import Optional, Callable, List, ClassVar
 
+# UI日志合并发送的时间窗口（秒）和每批最多合并的消息条数
+_UI_BATCH_INTERVAL = 0.05
+_UI_BATCH_SIZE = 200
+
 class Logger:
     """日志管理器，提供统一的日志记录接口"""
     
     _instance: ClassVar[Optional['Logger']] = None  # 单例实例
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()  # 保证多个线程同时获取时只创建一个实例
     
     @classmethod
     def instance(cls) -> 'Logger':
         """获取单例实例"""
         if cls._instance is None:
-            cls._instance = Logger()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = Logger()
         return cls._instance
     
-    def __init__(self) -> None:
-        """初始化日志管理器"""
+    def __init__(self, setup_handlers: bool = True) -> None:
+        """
+        初始化日志管理器
+        
+        Args:
+            setup_handlers: 是否创建日志文件和控制台输出，进程池子进程中为False
+        """
         # 防止重复初始化
         if Logger._instance is not None:
             return
-            
-        # 创建日志目录
+        
+        # 用于UI回调的列表
+        self.ui_callbacks: List[Callable[[str], None]] = []
+        
+        # 待发送给UI的消息队列，由后台线程合并后统一回调，记录日志的线程不必等待UI处理
+        self._ui_queue: "queue.Queue[str]" = queue.Queue()
+        self._ui_thread: Optional[threading.Thread] = None
+        
         self.log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
-        os.makedirs(self.log_dir, exist_ok=True)
         
         # 创建日志记录器
         self.logger = logging.getLogger("translation_extractor")
-        self.logger.setLevel(logging.DEBUG)
         
         # 清除已存在的处理器
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
         
+        if not setup_handlers:
+            # 不创建日志文件，也不输出到控制台；调试和信息级别的日志直接跳过
+            self.logger.setLevel(logging.WARNING)
+            self.logger.addHandler(logging.NullHandler())
+            self.logger.propagate = False
+            return
+        
+        # 创建日志目录
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.logger.setLevel(logging.DEBUG)
+        
         # 创建文件处理器
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         log_file = os.path.join(self.log_dir, f"extractor_{timestamp}.log")
@@ -56,74 +87,141 @@ class Logger:
         # 添加处理器
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
-        
-        # 用于UI回调的列表
-        self.ui_callbacks: List[Callable[[str], None]] = []
     
     def add_ui_callback(self, callback: Callable[[str], None]) -> None:
-        """添加UI日志回调函数"""
+        """
+        添加UI日志回调函数
+        
+        回调不在记录日志的线程中调用，而是在名为"ui-log"的后台守护线程中调用；
+        每次调用传入50毫秒内合并的最多200条消息，各条消息以'\n'连接为一个字符串。
+        回调需要更新界面时由回调自行切换到界面线程（例如通过Qt信号）
+        
+        Args:
+            callback: 接收合并后消息字符串的回调函数
+        """
         if callback not in self.ui_callbacks:
             self.ui_callbacks.append(callback)
+        self._start_ui_thread()
     
     def remove_ui_callback(self, callback: Callable[[str], None]):
         """移除UI日志回调函数"""
         if callback in self.ui_callbacks:
             self.ui_callbacks.remove(callback)
     
-    def _notify_ui(self, message: str):
-        """通知所有UI回调"""
-        for callback in self.ui_callbacks:
-            try:
-                callback(message)
-            except Exception as e:
-                self.logger.error(f"UI回调异常: {str(e)}")
+    def _start_ui_thread(self) -> None:
+        """启动UI日志发送线程，只在第一次添加回调时启动"""
+        with Logger._instance_lock:
+            if self._ui_thread is None:
+                self._ui_thread = threading.Thread(target=self._ui_loop, name="ui-log", daemon=True)
+                self._ui_thread.start()
     
-    def debug(self, message: str):
-        """记录调试级别日志"""
-        self.logger.debug(message)
+    def _ui_loop(self) -> None:
+        """
+        从队列中取出消息，在一个时间窗口内合并后统一调用UI回调
+        
+        大量连续的日志只触发少数几次回调，减少界面刷新次数
+        """
+        ui_queue = self._ui_queue
+        while True:
+            batch = [ui_queue.get()]
+            deadline = time.monotonic() + _UI_BATCH_INTERVAL
+            while len(batch) < _UI_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(ui_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            message = '\n'.join(batch)
+            # 回调列表可能在其他线程中被修改，遍历副本
+            for callback in tuple(self.ui_callbacks):
+                try:
+                    callback(message)
+                except Exception as e:
+                    self.logger.error(f"UI回调异常: {str(e)}")
     
-    def info(self, message: str):
+    def _notify_ui(self, message: str, args: tuple = ()):
+        """将消息放入UI队列，没有回调时不格式化消息"""
+        if not self.ui_callbacks:
+            return
+        # 在当前线程中格式化，参数之后被修改也不影响消息内容
+        if args:
+            message = message % args
+        self._ui_queue.put_nowait(message)
+    
+    def debug(self, message: str, *args):
+        """
+        记录调试级别日志
+        
+        消息可以使用%s占位符并通过args传入参数，由logging在真正输出时才格式化
+        """
+        self.logger.debug(message, *args)
+    
+    def info(self, message: str, *args):
         """记录信息级别日志"""
-        self.logger.info(message)
-        self._notify_ui(message)
+        self.logger.info(message, *args)
+        self._notify_ui(message, args)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """记录警告级别日志"""
-        self.logger.warning(message)
-        self._notify_ui(f"⚠️ {message}")
+        self.logger.warning(message, *args)
+        self._notify_ui(f"⚠️ {message}", args)
     
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """记录错误级别日志"""
-        self.logger.error(message)
-        self._notify_ui(f"❌ {message}")
+        self.logger.error(message, *args)
+        self._notify_ui(f"❌ {message}", args)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args):
         """记录严重错误级别日志"""
-        self.logger.critical(message)
-        self._notify_ui(f"🔥 {message}")
+        self.logger.critical(message, *args)
+        self._notify_ui(f"🔥 {message}", args)
 
 # 提供便捷访问方式
+@lru_cache(maxsize=None)
 def get_logger() -> Logger:
-    """获取日志管理器实例"""
+    """
+    获取日志管理器实例
+    
+    结果被缓存，之后的调用直接返回同一个实例；
+    缓存未命中时可能有多个线程同时进入，实例的创建由Logger.instance()加锁保证唯一
+    """
     return Logger.instance()
 
+def init_worker_logger() -> Logger:
+    """
+    在进程池子进程中初始化日志管理器
+    
+    以spawn方式启动的子进程中还没有日志管理器，创建一个不写日志文件、不输出到控制台的实例，
+    避免每个子进程都新建一个日志文件；以fork方式启动的子进程继承了主进程的实例，
+    但没有继承发送UI日志的线程，需要清空UI回调，避免消息在队列中堆积却永远不会发送
+    """
+    with Logger._instance_lock:
+        if Logger._instance is None:
+            Logger._instance = Logger(setup_handlers=False)
+    logger = get_logger()
+    logger.ui_callbacks.clear()
+    return logger
+
 # 提供便捷函数
-def debug(message: str):
+def debug(message: str, *args):
     """记录调试级别日志"""
-    get_logger().debug(message)
+    get_logger().debug(message, *args)
 
-def info(message: str):
+def info(message: str, *args):
     """记录信息级别日志"""
-    get_logger().info(message)
+    get_logger().info(message, *args)
 
-def warning(message: str):
+def warning(message: str, *args):
     """记录警告级别日志"""
-    get_logger().warning(message)
+    get_logger().warning(message, *args)
 
-def error(message: str):
+def error(message: str, *args):
     """记录错误级别日志"""
-    get_logger().error(message)
+    get_logger().error(message, *args)
 
-def critical(message: str):
+def critical(message: str, *args):
     """记录严重错误级别日志"""
-    get_logger().critical(message)
+    get_logger().critical(message, *args)
@@ -1,10 +1,15 @@
 """
 Renpy文件的正则表达式模式集合，专用于提取指定的三种属性
 """
+import re
+from functools import lru_cache
+from typing import Pattern, Tuple
 
 # 通用字符串匹配模式
 # 匹配单引号、双引号和三引号字符串
-STRING_PATTERN = r'(?:"(?:\\"|[^"])*"|\'(?:\\\'|[^\'])*\'|"""(?:[^"]|"(?!""))*"""|\'\'\'(?:[^\']|\'(?!\'\'))*\'\'\')'
+# 单双引号分支采用展开循环的写法：普通字符由[^"\\]*整段匹配，只在遇到反斜杠时进入下一轮，
+# 紧跟在反斜杠后的引号视为转义；匹配结果与逐字符交替(?:\\"|[^"])*的写法相同，但回溯少得多
+STRING_PATTERN = r'(?:"[^"\\]*(?:\\"?[^"\\]*)*"|\'[^\'\\]*(?:\\\'?[^\'\\]*)*\'|"""(?:[^"]|"(?!""))*"""|\'\'\'(?:[^\']|\'(?!\'\'))*\'\'\')'
 
 # 匹配属性赋值模式
 # 适用于description、purchase_notification、unlock_notification等
@@ -14,6 +19,19 @@ def create_property_pattern(property_name):
     """创建用于匹配特定属性的正则表达式模式"""
     return rf'{property_name}\s*=\s*((?:f)?{STRING_PATTERN})'
 
+def create_fused_property_pattern(property_names):
+    """
+    创建将多个属性合并为单个正则表达式的模式
+    
+    只有属性名作为交替分支，字符串模式只出现一次，所有属性的值都由第1个分组捕获
+    """
+    return rf'(?:{"|".join(property_names)})\s*=\s*((?:f)?{STRING_PATTERN})'
+
+@lru_cache(maxsize=64)
+def compile_fused_property_pattern(property_names: Tuple[str, ...]) -> Pattern:
+    """获取多个属性合并后的预编译正则表达式，每种属性组合的编译结果保存在有上限的缓存中"""
+    return re.compile(create_fused_property_pattern(property_names))
+
 # 预定义三个目标属性模式
 DESCRIPTION_PATTERN = create_property_pattern('description')
 PURCHASE_NOTIFICATION_PATTERN = create_property_pattern('purchase_notification')
@@ -22,5 +40,11 @@ UNLOCK_NOTIFICATION_PATTERN = create_property_pattern('unlock_notification')
 # 多行注释模式（用于排除注释中的内容）
 MULTILINE_COMMENT_PATTERN = r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\''
 
-# 单行注释模式
-SINGLE_LINE_COMMENT_PATTERN = r'#.*?$'
+# 单行注释模式，贪婪匹配到行尾，不依赖re.MULTILINE下的$锚点
+SINGLE_LINE_COMMENT_PATTERN = r'#[^\n]*'
+
+# 合并的注释模式，一次扫描同时匹配多行注释和单行注释
+COMMENT_PATTERN = f'{MULTILINE_COMMENT_PATTERN}|{SINGLE_LINE_COMMENT_PATTERN}'
+
+# 预编译的合并注释模式
+COMMENT_RE = re.compile(COMMENT_PATTERN)
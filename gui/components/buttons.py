@@ -1,8 +1,22 @@
 from PyQt5.QtWidgets import QPushButton, QSizePolicy
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon
 from .styles import StyleManager
 
+# 图标按钮的透明样式，所有图标按钮共用同一个字符串
+ICON_BUTTON_STYLESHEET = """
+    QPushButton {
+        background-color: transparent;
+        border: none;
+    }
+    QPushButton:hover {
+        background-color: rgba(0, 0, 0, 0.1);
+        border-radius: 3px;
+    }
+    QPushButton:pressed {
+        background-color: rgba(0, 0, 0, 0.2);
+    }
+"""
+
 class ActionButton(QPushButton):
     """
     通用操作按钮，提供统一的外观和行为
@@ -116,16 +130,4 @@ class IconButton(QPushButton):
             self.setToolTip(tooltip)
         
         # 应用透明样式
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: rgba(0, 0, 0, 0.1);
-                border-radius: 3px;
-            }
-            QPushButton:pressed {
-                background-color: rgba(0, 0, 0, 0.2);
-            }
-        """)
+        self.setStyleSheet(ICON_BUTTON_STYLESHEET)
@@ -2,9 +2,10 @@
 样式管理模块
 提供全局统一的UI样式定义，使界面风格保持一致
 """
+from functools import lru_cache
 from PyQt5.QtGui import QColor, QFont, QPalette
 from PyQt5.QtWidgets import QWidget, QPushButton, QLabel, QLineEdit, QApplication
-from typing import Dict, Any, Optional
+from typing import Optional
 
 class StyleManager:
     """样式管理器，提供统一的应用风格"""
@@ -71,8 +72,14 @@ class StyleManager:
         app.setFont(cls.FONTS["default"])
     
     @staticmethod
+    @lru_cache(maxsize=16)
     def get_button_stylesheet(button_type: str = "default") -> str:
-        """获取按钮样式表"""
+        """
+        获取按钮样式表
+        
+        同一类型的按钮共用同一个样式表字符串，只在第一次获取时生成；
+        生成后再修改COLORS和SIZES不会影响已缓存的样式表
+        """
         styles = {
             "default": f"""
                 QPushButton {{
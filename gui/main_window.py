@@ -1,15 +1,11 @@
 import os
-from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QLabel, QMessageBox,
-                            QGroupBox, QFormLayout, QLineEdit, QTabWidget,
-                            QApplication)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings
-from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QMessageBox,
+                            QTabWidget)
+from PyQt5.QtCore import QThread, pyqtSignal, QSettings
 from core.extractor import TranslationExtractor
 from core.config import TranslationConfig
 from core.logger import get_logger
 from core.events import subscribe, unsubscribe, publish, EventNames
-from gui.components.buttons import ActionButton
 from gui.tabs.settings_tab import SettingsTab
 from gui.tabs.home_tab import HomeTab
 
@@ -37,15 +33,9 @@ class ExtractorThread(QThread):
                 except Exception:
                     pass
                     
-            def safe_emit_log(message):
-                try:
-                    self.log_update.emit(message)
-                except Exception:
-                    pass
-            
             # 连接信号
+            # 提取器的日志同时写入全局日志，由全局日志的UI回调送到界面，不再设置log_callback，避免重复显示
             self.extractor.progress_callback = safe_emit_progress
-            self.extractor.log_callback = safe_emit_log
             
             # 发布开始提取事件
             publish(EventNames.EXTRACTION_STARTED, config=self.config)
@@ -74,6 +64,9 @@ class ExtractorThread(QThread):
 
 
 class MainWindow(QMainWindow):
+    # 全局日志在后台线程中回调，通过信号转到界面线程更新日志
+    logger_message = pyqtSignal(str)
+    
     def __init__(self, config=None):
         super().__init__()
         self.setWindowTitle("Renpy游戏翻译提取器")
@@ -82,7 +75,10 @@ class MainWindow(QMainWindow):
         
         # 设置日志记录器
         self.logger = get_logger()
-        self.logger.add_ui_callback(self.log)
+        self.logger_message.connect(self.log)
+        # 保存回调对象，关闭窗口时用同一个对象移除
+        self._logger_callback = self.logger_message.emit
+        self.logger.add_ui_callback(self._logger_callback)
         
         # 初始化历史目录列表
         self.history_dirs = []
@@ -111,6 +107,9 @@ class MainWindow(QMainWindow):
     
     def add_to_history_dirs(self, dir_path):
         """添加目录到历史记录"""
+        # 已经是最近的目录时历史记录不变，无需保存和重建菜单
+        if self.history_dirs and self.history_dirs[0] == dir_path:
+            return
         if dir_path in self.history_dirs:
             # 如果已存在，移到最前面
             self.history_dirs.remove(dir_path)
@@ -196,8 +195,7 @@ class MainWindow(QMainWindow):
         """添加日志到日志文本框"""
         try:
             if hasattr(self, 'home_tab') and self.home_tab:
-                # 使用简单直接的方式更新日志
-                QApplication.instance().processEvents()  # 确保处理所有待处理的事件
+                # 日志都通过信号在界面线程中送达，直接更新即可
                 self.home_tab.append_log(message)
         except Exception as e:
             print(f"日志更新错误: {str(e)}")
@@ -221,7 +219,19 @@ class MainWindow(QMainWindow):
         return self.config
     
     def apply_config_to_ui(self):
-        """将配置对象应用到UI"""
+        """
+        将配置对象应用到UI
+        
+        逐个设置控件时暂停窗口重绘，全部设置完成后只重绘一次
+        """
+        self.setUpdatesEnabled(False)
+        try:
+            self._apply_config_to_widgets()
+        finally:
+            self.setUpdatesEnabled(True)
+    
+    def _apply_config_to_widgets(self):
+        """将配置对象的各项设置写入各选项卡的控件"""
         # 更新主页选项卡
         self.home_tab.set_game_dir(self.config.game_dir)
         self.home_tab.set_translation_dir(self.config.translation_dir)
@@ -233,7 +243,10 @@ class MainWindow(QMainWindow):
             for fmt, checkbox in self.settings_tab.file_format_checkboxes.items():
                 # 检查该格式的文件模式是否在配置中
                 pattern = f"*.{fmt}"
+                # 设置期间屏蔽信号，避免每个复选框都刷新一遍提取模式，设置完后统一刷新一次
+                checkbox.blockSignals(True)
                 checkbox.setChecked(pattern in self.config.file_patterns)
+                checkbox.blockSignals(False)
             
             # 触发文件格式更新事件
             self.settings_tab.update_extraction_modes_availability()
@@ -361,7 +374,7 @@ class MainWindow(QMainWindow):
         self.save_history_dirs()
         
         # 移除日志回调，防止内存泄漏
-        self.logger.remove_ui_callback(self.log)
+        self.logger.remove_ui_callback(self._logger_callback)
         
         # 取消订阅所有事件
         unsubscribe(EventNames.EXTRACTION_PROGRESS, self.handle_extraction_progress)
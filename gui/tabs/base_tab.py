@@ -3,7 +3,6 @@
 为所有选项卡提供通用功能
 """
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QHBoxLayout, QLabel
-from PyQt5.QtCore import Qt
 from gui.components.scroll_area import ScrollArea
 from core.logger import get_logger
 
@@ -2,9 +2,8 @@
 主页选项卡模块
 用于显示主要的应用程序功能，包括游戏目录选择和提取进度显示
 """
-from PyQt5.QtCore import Qt, QThread
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                            QLineEdit, QProgressBar, QGroupBox,
+from PyQt5.QtCore import QThread
+from PyQt5.QtWidgets import (QHBoxLayout, QLineEdit, QProgressBar,
                             QPushButton, QFileDialog, QMenu, QAction,
                             QTextEdit, QRadioButton, QApplication)
 import os
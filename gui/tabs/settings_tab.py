@@ -5,13 +5,15 @@
 from PyQt5.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel, QCheckBox,
                             QGroupBox, QFormLayout, QComboBox, QGridLayout, QPushButton,
                             QMessageBox)
-import os
 from core.factories.extractor_factory import ExtractorFactory
 from core.factories.validator_factory import ValidatorFactory
 from core.config import TranslationConfig
 from core.events import publish, EventNames
 from gui.tabs.base_tab import BaseTab
 
+# 提取模式描述标签的样式，设置在分组框上，所有描述标签共用
+EXTRACTOR_DESCRIPTION_STYLESHEET = "QLabel#extractorDescription { color: #666666; font-style: italic; }"
+
 class SettingsTab(BaseTab):
     """设置选项卡，包含应用程序的各种设置选项"""
     
@@ -94,6 +96,7 @@ class SettingsTab(BaseTab):
     def create_extraction_modes_group(self):
         """创建提取模式设置组"""
         extraction_modes_group = QGroupBox("提取模式管理")
+        extraction_modes_group.setStyleSheet(EXTRACTOR_DESCRIPTION_STYLESHEET)
         extraction_modes_layout = QVBoxLayout()
         
         # 提示文本
@@ -132,7 +135,8 @@ class SettingsTab(BaseTab):
                 description = "从JSON文件中提取 'display_name' 字段"
             
             desc_label = QLabel(description)
-            desc_label.setStyleSheet("color: #666666; font-style: italic;")
+            # 样式由分组框上的样式表按对象名统一设置，不再为每个标签单独设置样式表
+            desc_label.setObjectName("extractorDescription")
             
             # 根据文件格式分配到不同组
             if file_format == "json":
@@ -1,14 +1,14 @@
 import sys
 import os
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QTextCursor
 
 # 移除无法导入的 qRegisterMetaType 函数
 # 不再需要注册元类型，因为我们将使用更安全的方法处理跨线程信号
 
 from gui.main_window import MainWindow
 from core.logger import get_logger
-from core.events import get_event_manager, EventNames, publish
+from core.events import EventNames, publish
 from gui.components.styles import StyleManager
 from core.config import TranslationConfig
 
@@ -49,4 +49,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # 打包为可执行文件时，进程池的子进程需要此调用
+    multiprocessing.freeze_support()
     sys.exit(main())